@@ -22,6 +22,7 @@ from django.db.models.functions import Left, Length
 from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse
 from django.utils.functional import cached_property
+from django.utils.cache import patch_cache_control
 from django.utils.text import capfirst, slugify
 from django.utils.translation import gettext_lazy as _
 
@@ -2200,7 +2201,11 @@ class ConfigView(drf.views.APIView):
 
         dict_settings["theme_customization"] = self._load_theme_customization()
 
-        return drf.response.Response(dict_settings)
+        response = drf.response.Response(dict_settings)
+        # Fetched on every frontend load, let browsers and proxies cache it. Only
+        # set here so that errors and throttled responses are never cached.
+        patch_cache_control(response, public=True, max_age=600)
+        return response
 
     def _load_theme_customization(self):
         if not settings.THEME_CUSTOMIZATION_FILE_PATH:
@@ -5,19 +5,149 @@ This backend uses Resend's REST API instead of SMTP, which is useful for
 platforms like Railway that block SMTP ports.
 """
 import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from typing import Any, Optional
 
-import requests
 from django.conf import settings
 from django.core.mail.backends.base import BaseEmailBackend
 from django.core.mail.message import EmailMessage, EmailMultiAlternatives
 
+import orjson
+import requests
+from celery import group
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
 logger = logging.getLogger(__name__)
 
 RESEND_API_URL = "https://api.resend.com/emails"
 
+# Statuses returned by the API for transient failures, worth retrying
+RESEND_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Statuses returned by the API when the payload itself is invalid
+RESEND_INVALID_PAYLOAD_STATUSES = (400, 422)
+
+# Header identifying a send to the API, so that sending again is a no-op
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Attribute of the messages holding their idempotency key
+IDEMPOTENCY_ATTRIBUTE = "_resend_idempotency"
+
+# Payload keys holding the message content, as opposed to its envelope
+RESEND_CONTENT_KEYS = ("subject", "html", "text")
+
+
+class ResendAPIError(Exception):
+    """Raised when the Resend API fails to send an email."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retryable: bool = False,
+    ) -> None:
+        """Set the HTTP status and whether sending again may succeed."""
+        self.message = message
+        self.status_code = status_code
+        self.retryable = retryable
+        super().__init__(self.message)
+
+
+def _get_message_fingerprint(message: EmailMessage) -> int:
+    """
+    Hash the fields a message is sent with, to tell when it has been modified.
+    """
+    return hash(
+        (
+            message.subject,
+            message.body,
+            message.from_email,
+            tuple(message.to),
+            tuple(message.cc),
+            tuple(message.bcc),
+            tuple(message.reply_to),
+            message.content_subtype,
+            tuple(tuple(alt) for alt in getattr(message, "alternatives", ())),
+        )
+    )
+
+
+def set_idempotency_key(message: EmailMessage, key: str) -> None:
+    """
+    Set the idempotency key of a message as it currently is.
+    """
+    setattr(message, IDEMPOTENCY_ATTRIBUTE, (_get_message_fingerprint(message), key))
+
+
+def get_idempotency_key(message: EmailMessage) -> str:
+    """
+    Return the idempotency key of a message, assigning one on first use.
+
+    The key is kept on the message, outside of its headers, so that every send of the
+    same message, including those retried by the application or by Celery, uses the
+    same key. A message modified since its key was assigned gets a new one.
+    """
+    fingerprint, key = getattr(message, IDEMPOTENCY_ATTRIBUTE, (None, None))
+    if key is None or fingerprint != _get_message_fingerprint(message):
+        key = str(uuid.uuid4())
+        set_idempotency_key(message, key)
+    return key
+
 
-class ResendEmailBackend(BaseEmailBackend):
+def serialize_email_message(message: EmailMessage) -> dict[str, Any]:
+    """
+    Convert an EmailMessage to a JSON serializable dict so it can be queued.
+
+    Only the fields used to build the Resend API payload are kept.
+    """
+    serialized = {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email,
+        "to": list(message.to),
+        "cc": list(message.cc),
+        "bcc": list(message.bcc),
+        "reply_to": list(message.reply_to),
+        "content_subtype": message.content_subtype,
+        "idempotency_key": get_idempotency_key(message),
+    }
+    if isinstance(message, EmailMultiAlternatives):
+        serialized["alternatives"] = [
+            [content, mimetype] for content, mimetype in message.alternatives
+        ]
+    return serialized
+
+
+def deserialize_email_message(serialized: dict[str, Any]) -> EmailMessage:
+    """
+    Rebuild an EmailMessage from the output of `serialize_email_message`.
+    """
+    kwargs = {
+        "subject": serialized["subject"],
+        "body": serialized["body"],
+        "from_email": serialized["from_email"],
+        "to": serialized["to"],
+        "cc": serialized["cc"],
+        "bcc": serialized["bcc"],
+        "reply_to": serialized["reply_to"],
+    }
+    if "alternatives" in serialized:
+        message = EmailMultiAlternatives(
+            alternatives=[tuple(alt) for alt in serialized["alternatives"]],
+            **kwargs,
+        )
+    else:
+        message = EmailMessage(**kwargs)
+    message.content_subtype = serialized["content_subtype"]
+    if "idempotency_key" in serialized:
+        set_idempotency_key(message, serialized["idempotency_key"])
+    return message
+
+
+class ResendEmailBackend(BaseEmailBackend):  # pylint: disable=too-many-instance-attributes
     """
     Email backend that sends emails via Resend's REST API.
 
@@ -27,6 +157,10 @@ class ResendEmailBackend(BaseEmailBackend):
 
     Optional settings:
     - RESEND_API_URL: Override the Resend API URL (default: https://api.resend.com/emails)
+    - RESEND_POOL_SIZE: Maximum number of pooled connections to the API (default: 10)
+    - RESEND_BATCH_SIZE: Maximum number of emails per batch request (default: 100)
+    - RESEND_USE_BATCH: Send multiple emails through the batch endpoint, or else
+      concurrently through the single email endpoint (default: True)
     """
 
     def __init__(
@@ -38,6 +172,10 @@ class ResendEmailBackend(BaseEmailBackend):
         self.api_key = getattr(settings, "RESEND_API_KEY", None)
         self.api_url = getattr(settings, "RESEND_API_URL", RESEND_API_URL)
         self.from_email = getattr(settings, "EMAIL_FROM", None)
+        self.timeout = getattr(settings, "EMAIL_TIMEOUT", 10)
+        self.batch_size = getattr(settings, "RESEND_BATCH_SIZE", 100)
+        self.use_batch = getattr(settings, "RESEND_USE_BATCH", True)
+        self.pool_size = getattr(settings, "RESEND_POOL_SIZE", 10)
 
         if not self.api_key:
             if not fail_silently:
@@ -53,6 +191,42 @@ class ResendEmailBackend(BaseEmailBackend):
                 )
             logger.warning("EMAIL_FROM not set, email sending will fail")
 
+        # Share one session across sends so the TCP+TLS connection to the API
+        # is pooled instead of being renegotiated for every email
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=1,
+                # Sized like the thread pool so concurrent sends don't wait on a socket
+                pool_maxsize=self.pool_size,
+                # Retry transient failures with a jittered exponential backoff,
+                # waiting as long as the API asks to when rate limited
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    backoff_jitter=0.5,
+                    status_forcelist=RESEND_RETRY_STATUSES,
+                    allowed_methods=frozenset({"POST"}),
+                    respect_retry_after_header=True,
+                    # Return the last response so its error details can be reported
+                    raise_on_status=False,
+                ),
+            ),
+        )
+        self._session.headers.update(
+            {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            }
+        )
+
+    def close(self) -> None:
+        """
+        Close the underlying HTTP session and release pooled connections.
+        """
+        self._session.close()
+
     def send_messages(self, email_messages: list[EmailMessage]) -> int:
         """
         Send one or more EmailMessage objects and return the number of emails sent.
@@ -67,10 +241,28 @@ class ResendEmailBackend(BaseEmailBackend):
                 )
             return 0
 
+        if len(email_messages) == 1:
+            return self._send_individually(email_messages)
+
+        if not self.use_batch:
+            return self._send_concurrently(email_messages)
+
+        # Group messages so that N emails cost ceil(N / batch size) requests
+        num_sent = 0
+        messages = iter(email_messages)
+        while chunk := list(islice(messages, self.batch_size)):
+            num_sent += self._send_batch(chunk)
+
+        return num_sent
+
+    def _send_individually(self, email_messages: list[EmailMessage]) -> int:
+        """
+        Send messages one by one through the single email endpoint.
+        """
         num_sent = 0
         for message in email_messages:
             try:
-                self._send_message(message)
+                self.send_message(message)
                 num_sent += 1
             except Exception as e:
                 if not self.fail_silently:
@@ -83,58 +275,187 @@ class ResendEmailBackend(BaseEmailBackend):
 
         return num_sent
 
-    def _send_message(self, message: EmailMessage) -> None:
+    def _send_concurrently(self, email_messages: list[EmailMessage]) -> int:
         """
-        Send a single EmailMessage via Resend API.
+        Send messages through the single email endpoint from a pool of threads.
         """
-        # Extract recipients
-        to_emails = message.to if isinstance(message.to, list) else [message.to]
-        cc_emails = message.cc if isinstance(message.cc, list) else (message.cc or [])
-        bcc_emails = (
-            message.bcc if isinstance(message.bcc, list) else (message.bcc or [])
+        num_sent = 0
+        max_workers = min(self.pool_size, len(email_messages))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(self.send_message, message) for message in email_messages
+            ]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    num_sent += 1
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    if not self.fail_silently:
+                        pool.shutdown(cancel_futures=True)
+                        raise
+                    logger.error(
+                        "Failed to send email via Resend: %s",
+                        e,
+                        exc_info=True,
+                    )
+
+        return num_sent
+
+    def _send_batch(self, email_messages: list[EmailMessage]) -> int:
+        """
+        Send a chunk of messages in a single request to the batch endpoint.
+
+        Messages whose payload can not be built fail on their own, the others being
+        still batched. Messages are only sent again one by one when the API rejected
+        the batch payload as invalid, so that only the invalid messages fail. Any
+        other error, e.g. an invalid API key or a server error after which the batch
+        may have been delivered, counts the whole batch as failed rather than sending
+        it again.
+        """
+        if len(email_messages) == 1:
+            return self._send_individually(email_messages)
+
+        valid_messages, payloads = self._build_payloads(email_messages)
+        if len(valid_messages) <= 1:
+            return self._send_individually(valid_messages)
+
+        # Derived from the keys of its messages, so the same batch keeps the same key
+        batch_key = str(
+            uuid.uuid5(
+                uuid.NAMESPACE_URL, ",".join(map(get_idempotency_key, valid_messages))
+            )
         )
 
-        # Use the message's from_email if set, otherwise fall back to settings
-        from_email = message.from_email or self.from_email
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Sending %d emails via Resend batch API", len(valid_messages))
+        try:
+            response = self._session.post(
+                f"{self.api_url.rstrip('/')}/batch",
+                data=self._encode_batch(payloads),
+                headers={
+                    IDEMPOTENCY_HEADER: batch_key,
+                    # Send the valid emails and report the invalid ones in "errors"
+                    "x-batch-validation": "permissive",
+                },
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            error = self._api_error(e)
+            if error.status_code in RESEND_INVALID_PAYLOAD_STATUSES:
+                logger.warning(
+                    "Resend batch request rejected, falling back to single sends: %s",
+                    error,
+                )
+                return self._send_individually(valid_messages)
 
-        # Prepare the payload
+            if not self.fail_silently:
+                raise error from e
+            logger.error(
+                "Failed to send emails via Resend batch: %s",
+                error,
+                exc_info=True,
+            )
+            return 0
+
+        result = response.json()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Emails sent successfully via Resend batch: ids=%s",
+                [item.get("id") for item in result.get("data") or []],
+            )
+
+        errors = result.get("errors") or []
+        if errors:
+            error_msg = f"Resend API error: {errors}"
+            if not self.fail_silently:
+                raise ResendAPIError(error_msg, status_code=response.status_code)
+            logger.error("Failed to send emails via Resend batch: %s", error_msg)
+
+        return len(valid_messages) - len(errors)
+
+    def _build_payloads(
+        self, email_messages: list[EmailMessage]
+    ) -> tuple[list[EmailMessage], list[dict[str, Any]]]:
+        """
+        Build the payloads of the messages that can be sent, along with these messages.
+        """
+        valid_messages, payloads = [], []
+        for message in email_messages:
+            try:
+                payloads.append(self._build_payload(message))
+            except ValueError as e:
+                if not self.fail_silently:
+                    raise
+                logger.error("Failed to send email via Resend: %s", e)
+            else:
+                valid_messages.append(message)
+
+        return valid_messages, payloads
+
+    @staticmethod
+    def _encode_batch(payloads: list[dict[str, Any]]) -> bytes:
+        """
+        Encode batch payloads to JSON.
+
+        Notifications are often fanned out with the same content to many recipients,
+        so the content shared by several payloads is only serialized once and spliced
+        into each payload next to its serialized envelope.
+        """
+        encoded_contents: dict[tuple, bytes] = {}
+        items = []
+        for payload in payloads:
+            content = {
+                key: payload[key] for key in RESEND_CONTENT_KEYS if key in payload
+            }
+            content_key = tuple(content.items())
+            encoded_content = encoded_contents.get(content_key)
+            if encoded_content is None:
+                encoded_content = encoded_contents[content_key] = orjson.dumps(content)
+
+            envelope = {
+                key: value
+                for key, value in payload.items()
+                if key not in RESEND_CONTENT_KEYS
+            }
+            # '{"from":...}' and '{"subject":...}' become '{"from":...,"subject":...}'
+            items.append(orjson.dumps(envelope)[:-1] + b"," + encoded_content[1:])
+
+        return b"[" + b",".join(items) + b"]"
+
+    def _build_payload(self, message: EmailMessage) -> dict[str, Any]:
+        """
+        Build the Resend API payload for a single EmailMessage.
+        """
+        # Django's EmailMessage already coerces recipients to lists
+        # Use the message's from_email if set, otherwise fall back to settings
         payload: dict[str, Any] = {
-            "from": from_email,
-            "to": to_emails,
+            "from": message.from_email or self.from_email,
+            "to": message.to,
             "subject": message.subject,
         }
-
-        # Add CC and BCC if present
-        if cc_emails:
-            payload["cc"] = cc_emails
-        if bcc_emails:
-            payload["bcc"] = bcc_emails
-
-        # Handle reply-to
+        if message.cc:
+            payload["cc"] = message.cc
+        if message.bcc:
+            payload["bcc"] = message.bcc
         if message.reply_to:
-            reply_to = (
-                message.reply_to
-                if isinstance(message.reply_to, list)
-                else [message.reply_to]
-            )
-            payload["reply_to"] = reply_to
+            payload["reply_to"] = message.reply_to
 
         # Handle email body
         # Resend supports both text and HTML
         if isinstance(message, EmailMultiAlternatives):
-            # Check for HTML alternative
-            html_content = None
-            text_content = None
-
-            for content, content_type in message.alternatives:
-                if content_type == "text/html":
-                    html_content = content
-                elif content_type == "text/plain":
-                    text_content = content
-
-            # If no explicit text/plain alternative, use the body
-            if not text_content:
+            alternatives = message.alternatives
+            if len(alternatives) == 1 and alternatives[0][1] == "text/html":
+                # Common case: a single HTML alternative with the body as text
+                html_content = alternatives[0][0]
                 text_content = message.body
+            else:
+                by_type = {
+                    content_type: content for content, content_type in alternatives
+                }
+                html_content = by_type.get("text/html")
+                # If no explicit text/plain alternative, use the body
+                text_content = by_type.get("text/plain") or message.body
 
             if html_content:
                 payload["html"] = html_content
@@ -147,44 +468,104 @@ class ResendEmailBackend(BaseEmailBackend):
             else:
                 payload["text"] = message.body
 
-        # Log the send attempt
-        logger.info(
-            "Sending email via Resend API: from=%s, to=%s, subject=%s",
-            from_email,
-            to_emails,
-            message.subject,
-        )
+        # Resend rejects emails without content, fail before making the request
+        if "html" not in payload and "text" not in payload:
+            raise ValueError("Email has no body content")
 
-        # Make the API request
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        return payload
 
+    def send_message(self, message: EmailMessage) -> None:
+        """
+        Send a single EmailMessage via Resend API, raising ResendAPIError on failure.
+        """
+        payload = self._build_payload(message)
+
+        # Log the send attempt
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Sending email via Resend API: from=%s, to=%s, subject=%s",
+                payload["from"],
+                payload["to"],
+                payload["subject"],
+            )
+
+        # Make the API request, the session already sends the JSON content type
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.api_url,
-                json=payload,
-                headers=headers,
-                timeout=getattr(settings, "EMAIL_TIMEOUT", 10),
+                data=orjson.dumps(payload),
+                headers={IDEMPOTENCY_HEADER: get_idempotency_key(message)},
+                timeout=self.timeout,
             )
             response.raise_for_status()
 
-            result = response.json()
-            logger.info(
-                "Email sent successfully via Resend: id=%s",
-                result.get("id"),
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Email sent successfully via Resend: id=%s",
+                    response.json().get("id"),
+                )
 
         except requests.exceptions.RequestException as e:
-            error_msg = f"Resend API error: {e}"
-            if hasattr(e, "response") and e.response is not None:
-                try:
-                    error_detail = e.response.json()
-                    error_msg = f"Resend API error: {error_detail}"
-                except Exception:
-                    error_msg = f"Resend API error: {e.response.status_code} {e.response.text}"
+            error = self._api_error(e)
+            logger.error(error.message)
+            raise error from e
+
+    @staticmethod
+    def _api_error(e: requests.exceptions.RequestException) -> ResendAPIError:
+        """
+        Describe a failed API request, telling whether sending again may succeed.
+        """
+        error_msg = f"Resend API error: {e}"
+        if hasattr(e, "response") and e.response is not None:
+            try:
+                error_detail = e.response.json()
+                error_msg = f"Resend API error: {error_detail}"
+            except Exception:  # noqa: BLE001
+                error_msg = (
+                    f"Resend API error: {e.response.status_code} {e.response.text}"
+                )
+
+        status_code = getattr(e.response, "status_code", None)
+        retryable = status_code in RESEND_RETRY_STATUSES or isinstance(
+            e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        )
+        return ResendAPIError(error_msg, status_code=status_code, retryable=retryable)
 
-            logger.error(error_msg)
-            raise Exception(error_msg) from e
 
+class QueuedResendEmailBackend(BaseEmailBackend):
+    """
+    Email backend that queues emails in Celery to be sent via Resend's REST API.
+
+    Each message is serialized and handed over to its own `send_resend_email` task,
+    which sends it with `ResendEmailBackend`, so the request thread does not wait on
+    the Resend API and a failing message does not affect the others.
+    """
+
+    def send_messages(self, email_messages: list[EmailMessage]) -> int:
+        """
+        Queue one or more EmailMessage objects and return the number of emails queued.
+        """
+        if not email_messages:
+            return 0
+
+        # Imported here to avoid a circular import, the task relies on this module
+        from core.tasks.mail import (  # noqa: PLC0415  # pylint: disable=import-outside-toplevel,cyclic-import
+            send_resend_email,
+        )
+
+        try:
+            group(
+                send_resend_email.s(serialize_email_message(message))
+                for message in email_messages
+            ).apply_async()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if not self.fail_silently:
+                raise
+            logger.error(
+                "Failed to queue emails for Resend: %s",
+                e,
+                exc_info=True,
+            )
+            return 0
+
+        return len(email_messages)
@@ -1,8 +1,15 @@
 """Send mail using celery task."""
 
+from functools import cache
+
 from django.conf import settings
 
 from core import models
+from core.email_backends import (
+    ResendAPIError,
+    ResendEmailBackend,
+    deserialize_email_message,
+)
 
 from impress.celery_app import app
 
@@ -22,3 +29,25 @@ def send_ask_for_access_mail(ask_for_access_id):
                 access.user.email,
                 access.user.language or settings.LANGUAGE_CODE,
             )
+
+
+@cache
+def get_resend_backend():
+    """
+    Return the Resend backend of the worker process, its HTTP session keeping
+    connections to the API open between tasks.
+    """
+    return ResendEmailBackend()
+
+
+@app.task(bind=True, max_retries=3, default_retry_delay=60)
+def send_resend_email(self, serialized_message):
+    """Send an email queued by QueuedResendEmailBackend via the Resend API."""
+    message = deserialize_email_message(serialized_message)
+    try:
+        get_resend_backend().send_message(message)
+    except ResendAPIError as error:
+        # Permanent errors (e.g. an invalid payload) would fail again
+        if not error.retryable:
+            raise
+        raise self.retry(exc=error) from error
@@ -64,6 +64,7 @@ def test_api_config(is_authenticated):
         "TRASHBIN_CUTOFF_DAYS": 30,
         "theme_customization": {},
     }
+    assert response.headers["Cache-Control"] == "public, max-age=600"
     policy_list = sorted(response.headers["Content-Security-Policy"].split("; "))
     assert policy_list == [
         "base-uri 'none'",
@@ -186,9 +187,13 @@ def test_api_config_throttling(settings):
     for _i in range(2):
         response = client.get("/api/v1.0/config/")
         assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "public, max-age=600"
     with patch("core.api.throttling.capture_message") as mock_capture_message:
         response = client.get("/api/v1.0/config/")
         assert response.status_code == 429
+        # Throttled responses must not be cached
+        assert "max-age" not in response.headers.get("Cache-Control", "")
+        assert "public" not in response.headers.get("Cache-Control", "")
         mock_capture_message.assert_called_once_with(
             "Rate limit exceeded for scope config", "warning"
         )
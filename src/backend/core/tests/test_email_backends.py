@@ -0,0 +1,549 @@
+"""
+Unit tests for the Resend email backend.
+"""
+
+import json
+from unittest import mock
+
+from django.core import mail
+
+import pytest
+import requests
+import responses
+
+from core.email_backends import (
+    RESEND_API_URL,
+    QueuedResendEmailBackend,
+    ResendAPIError,
+    ResendEmailBackend,
+    deserialize_email_message,
+    get_idempotency_key,
+    serialize_email_message,
+)
+from core.tasks.mail import get_resend_backend, send_resend_email
+
+
+@pytest.fixture(autouse=True)
+def resend_settings(settings):
+    """Configure the settings required by the Resend backend."""
+    settings.RESEND_API_KEY = "re_test_key"
+    settings.RESEND_API_URL = RESEND_API_URL
+    settings.EMAIL_FROM = "from@example.com"
+    # The backend of Celery workers is built from the settings on first use
+    get_resend_backend.cache_clear()
+    yield settings
+    get_resend_backend.cache_clear()
+
+
+def test_email_backends_resend_missing_api_key(settings):
+    """The backend should refuse to initialize without an API key."""
+    settings.RESEND_API_KEY = None
+
+    with pytest.raises(ValueError) as excinfo:
+        ResendEmailBackend()
+
+    assert str(excinfo.value) == (
+        "RESEND_API_KEY setting is required for ResendEmailBackend"
+    )
+
+
+RESEND_BATCH_URL = f"{RESEND_API_URL}/batch"
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_reuses_session():
+    """
+    All requests should go through the same pooled session, which carries
+    the authorization headers.
+    """
+    responses.post(RESEND_API_URL, json={"id": "1"}, status=200)
+    backend = ResendEmailBackend()
+    session = backend._session  # pylint: disable=protected-access
+
+    for recipient in ["to1@example.com", "to2@example.com"]:
+        message = mail.EmailMessage("Subject", "Body", to=[recipient])
+        assert backend.send_messages([message]) == 1
+
+    assert backend._session is session  # pylint: disable=protected-access
+    assert len(responses.calls) == 2
+    for call in responses.calls:
+        assert call.request.headers["Authorization"] == "Bearer re_test_key"
+        assert call.request.headers["Content-Type"] == "application/json"
+    assert (
+        len({call.request.headers["Idempotency-Key"] for call in responses.calls}) == 2
+    )
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_idempotency_key():
+    """Sending the same message again should reuse its idempotency key."""
+    responses.post(RESEND_API_URL, status=503, json={"message": "Unavailable"})
+    message = mail.EmailMessage("Subject", "Body", to=["to@example.com"])
+    backend = ResendEmailBackend(fail_silently=True)
+
+    assert backend.send_messages([message]) == 0
+    assert backend.send_messages([message]) == 0
+
+    # Calls retried by the session and sent again by the application share the key
+    assert {call.request.headers["Idempotency-Key"] for call in responses.calls} == {
+        get_idempotency_key(message)
+    }
+    # The key is not added to the headers of the email itself
+    assert message.extra_headers == {}
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_idempotency_key_modified_message():
+    """A message modified after being sent should be sent with a new key."""
+    responses.post(RESEND_API_URL, json={"id": "1"})
+    message = mail.EmailMessage("Subject", "Body", to=["to1@example.com"])
+    backend = ResendEmailBackend()
+
+    backend.send_messages([message])
+    message.to = ["to2@example.com"]
+    backend.send_messages([message])
+
+    keys = [call.request.headers["Idempotency-Key"] for call in responses.calls]
+    assert len(set(keys)) == 2
+    assert keys[1] == get_idempotency_key(message)
+
+
+def test_email_backends_resend_retries_transient_errors():
+    """The session should retry rate limits and server errors on POST requests."""
+    backend = ResendEmailBackend()
+
+    # pylint: disable=protected-access
+    retry = backend._session.get_adapter(RESEND_API_URL).max_retries
+    assert retry.total == 3
+    assert retry.backoff_jitter > 0
+    assert set(retry.status_forcelist) == {429, 500, 502, 503, 504}
+    assert retry.is_retry("POST", 429)
+    assert retry.respect_retry_after_header is True
+    assert retry.raise_on_status is False
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_single_message():
+    """A single message should be sent through the single email endpoint."""
+    responses.post(RESEND_API_URL, json={"id": "1"}, status=200)
+    message = mail.EmailMessage(
+        "Subject",
+        "Body",
+        from_email="sender@example.com",
+        to=["to@example.com"],
+        cc=["cc@example.com"],
+    )
+
+    assert ResendEmailBackend().send_messages([message]) == 1
+
+    assert len(responses.calls) == 1
+    assert json.loads(responses.calls[0].request.body) == {
+        "from": "sender@example.com",
+        "to": ["to@example.com"],
+        "cc": ["cc@example.com"],
+        "subject": "Subject",
+        "text": "Body",
+    }
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_batch(settings):
+    """Several messages should be chunked and sent through the batch endpoint."""
+    settings.RESEND_BATCH_SIZE = 2
+    responses.post(RESEND_BATCH_URL, json={"data": [{"id": "1"}, {"id": "2"}]})
+    responses.post(RESEND_API_URL, json={"id": "3"})
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=[f"to{i}@example.com"])
+        for i in range(3)
+    ]
+
+    assert ResendEmailBackend().send_messages(messages) == 3
+
+    assert [call.request.url for call in responses.calls] == [
+        RESEND_BATCH_URL,
+        RESEND_API_URL,
+    ]
+    payloads = json.loads(responses.calls[0].request.body)
+    assert [payload["to"] for payload in payloads] == [
+        ["to0@example.com"],
+        ["to1@example.com"],
+    ]
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_batch_partial_failure():
+    """
+    Items reported as failed by the batch endpoint should not be counted nor sent
+    again, the valid ones being sent by the batch request.
+    """
+    responses.post(
+        RESEND_BATCH_URL,
+        json={
+            "data": [{"id": "1"}],
+            "errors": [{"index": 1, "message": "Invalid `to` field"}],
+        },
+    )
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=[f"to{i}@example.com"])
+        for i in range(2)
+    ]
+
+    assert ResendEmailBackend(fail_silently=True).send_messages(messages) == 1
+    with pytest.raises(ResendAPIError, match="Invalid `to` field"):
+        ResendEmailBackend().send_messages(messages)
+
+    assert len(responses.calls) == 2
+    for call in responses.calls:
+        assert call.request.url == RESEND_BATCH_URL
+        assert call.request.headers["x-batch-validation"] == "permissive"
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_batch_rejected_fail_silently():
+    """
+    When the batch is rejected by the API, messages are sent one by one and only
+    those actually sent are counted.
+    """
+    responses.post(RESEND_BATCH_URL, status=400, json={"message": "Bad request"})
+    responses.post(RESEND_API_URL, json={"id": "1"})
+    responses.post(RESEND_API_URL, status=422, json={"message": "Invalid"})
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=[f"to{i}@example.com"])
+        for i in range(2)
+    ]
+
+    backend = ResendEmailBackend(fail_silently=True)
+    assert backend.send_messages(messages) == 1
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_batch_invalid_message():
+    """
+    Messages that can not be sent should fail on their own, the others being still
+    sent in a single batch request.
+    """
+    responses.post(RESEND_BATCH_URL, json={"data": [{"id": "1"}, {"id": "2"}]})
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=["to1@example.com"]),
+        mail.EmailMultiAlternatives("Subject", "", to=["empty@example.com"]),
+        mail.EmailMessage("Subject", "Body", to=["to2@example.com"]),
+    ]
+
+    assert ResendEmailBackend(fail_silently=True).send_messages(messages) == 2
+
+    assert len(responses.calls) == 1
+    assert [
+        payload["to"] for payload in json.loads(responses.calls[0].request.body)
+    ] == [["to1@example.com"], ["to2@example.com"]]
+
+    with pytest.raises(ValueError, match="Email has no body content"):
+        ResendEmailBackend().send_messages(messages)
+    assert len(responses.calls) == 1
+
+
+@pytest.mark.parametrize(
+    "response_kwargs",
+    [
+        {"body": requests.exceptions.ReadTimeout()},
+        {"body": requests.exceptions.ConnectionError()},
+        {"status": 503, "json": {"message": "Unavailable"}},
+    ],
+)
+def test_email_backends_resend_send_messages_batch_transient_failure(response_kwargs):
+    """
+    After a transport or server error the batch may have been delivered, it
+    should be counted as failed without sending the messages again.
+    """
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=[f"to{i}@example.com"])
+        for i in range(2)
+    ]
+
+    with responses.RequestsMock() as rsps:
+        rsps.post(RESEND_BATCH_URL, **response_kwargs)
+
+        assert ResendEmailBackend(fail_silently=True).send_messages(messages) == 0
+        with pytest.raises(ResendAPIError) as excinfo:
+            ResendEmailBackend().send_messages(messages)
+
+        assert excinfo.value.retryable is True
+        # Only the session may retry the batch request, never as single sends
+        assert {call.request.url for call in rsps.calls} == {RESEND_BATCH_URL}
+        assert (
+            len({call.request.headers["Idempotency-Key"] for call in rsps.calls}) == 1
+        )
+
+
+@pytest.mark.parametrize("status", [401, 403, 409])
+def test_email_backends_resend_send_messages_batch_not_payload_error(status):
+    """
+    Errors unrelated to the payload, such as an invalid API key, would fail again
+    for every message: the batch should be counted as failed without single sends.
+    """
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=[f"to{i}@example.com"])
+        for i in range(2)
+    ]
+
+    with responses.RequestsMock() as rsps:
+        rsps.post(RESEND_BATCH_URL, status=status, json={"message": "Error"})
+
+        assert ResendEmailBackend(fail_silently=True).send_messages(messages) == 0
+        with pytest.raises(ResendAPIError) as excinfo:
+            ResendEmailBackend().send_messages(messages)
+
+        assert excinfo.value.status_code == status
+        assert excinfo.value.retryable is False
+        assert [call.request.url for call in rsps.calls] == [RESEND_BATCH_URL] * 2
+
+
+def test_email_backends_resend_close_closes_session():
+    """Closing the backend should close its HTTP session."""
+    backend = ResendEmailBackend()
+
+    with mock.patch.object(
+        backend._session,  # pylint: disable=protected-access
+        "close",
+    ) as mock_close:
+        with backend:
+            pass
+
+    mock_close.assert_called_once_with()
+
+
+def test_email_backends_serialize_email_message_round_trip():
+    """A serialized message should be rebuilt with the same Resend payload."""
+    message = mail.EmailMultiAlternatives(
+        "Subject",
+        "Body",
+        from_email="sender@example.com",
+        to=["to@example.com"],
+        bcc=["bcc@example.com"],
+        reply_to=["reply@example.com"],
+    )
+    message.attach_alternative("<p>Body</p>", "text/html")
+
+    serialized = serialize_email_message(message)
+    rebuilt = deserialize_email_message(json.loads(json.dumps(serialized)))
+
+    assert get_idempotency_key(rebuilt) == get_idempotency_key(message)
+
+    backend = ResendEmailBackend()
+    # pylint: disable=protected-access
+    assert backend._build_payload(rebuilt) == backend._build_payload(message)
+
+
+def test_email_backends_serialize_email_message_html_subtype():
+    """Plain EmailMessage objects should keep their content subtype."""
+    message = mail.EmailMessage("Subject", "<p>Body</p>", to=["to@example.com"])
+    message.content_subtype = "html"
+
+    rebuilt = deserialize_email_message(serialize_email_message(message))
+
+    assert not isinstance(rebuilt, mail.EmailMultiAlternatives)
+    assert rebuilt.content_subtype == "html"
+
+
+@responses.activate
+def test_email_backends_queued_resend_send_messages():
+    """
+    Each message should be sent by its own task, a failing message not preventing
+    the next ones from being sent, and be counted as sent right away.
+    """
+
+    def reject_bad_recipient(request):
+        if json.loads(request.body)["to"] == ["bad@example.com"]:
+            return 422, {}, json.dumps({"message": "Invalid"})
+        return 200, {}, json.dumps({"id": "1"})
+
+    responses.add_callback(responses.POST, RESEND_API_URL, reject_bad_recipient)
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=[recipient])
+        for recipient in ["to1@example.com", "bad@example.com", "to2@example.com"]
+    ]
+
+    # Tasks are run eagerly in tests
+    assert QueuedResendEmailBackend().send_messages(messages) == 3
+
+    assert [json.loads(call.request.body)["to"] for call in responses.calls] == [
+        ["to1@example.com"],
+        ["bad@example.com"],
+        ["to2@example.com"],
+    ]
+
+
+@responses.activate
+def test_email_backends_queued_resend_send_messages_retry():
+    """
+    Retryable API errors should queue the message again with the same idempotency
+    key, while permanent errors drop the message without affecting the others.
+    """
+    attempts = {}
+
+    def flaky_api(request):
+        recipient = json.loads(request.body)["to"][0]
+        attempts.setdefault(recipient, []).append(request.headers["Idempotency-Key"])
+        if recipient == "bad@example.com":
+            return 422, {}, json.dumps({"message": "Invalid"})
+        if recipient == "flaky@example.com" and len(attempts[recipient]) == 1:
+            raise requests.exceptions.ConnectionError()
+        return 200, {}, json.dumps({"id": "1"})
+
+    responses.add_callback(responses.POST, RESEND_API_URL, flaky_api)
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=[recipient])
+        for recipient in ["flaky@example.com", "bad@example.com", "to@example.com"]
+    ]
+
+    with mock.patch.object(
+        send_resend_email, "retry", wraps=send_resend_email.retry
+    ) as mock_retry:
+        assert QueuedResendEmailBackend().send_messages(messages) == 3
+
+    mock_retry.assert_called_once()
+    assert mock_retry.call_args.kwargs["exc"].retryable is True
+    assert {recipient: len(keys) for recipient, keys in attempts.items()} == {
+        "flaky@example.com": 2,
+        "bad@example.com": 1,
+        "to@example.com": 1,
+    }
+    assert len(set(attempts["flaky@example.com"])) == 1
+
+
+def test_email_backends_queued_resend_reuses_worker_backend():
+    """Tasks should share the Resend backend, and its connection pool, of the worker."""
+    assert get_resend_backend() is get_resend_backend()
+
+
+@pytest.mark.parametrize(
+    "alternatives, expected",
+    [
+        (
+            [("<p>Html</p>", "text/html")],
+            {"html": "<p>Html</p>", "text": "Body"},
+        ),
+        (
+            [("<p>Html</p>", "text/html"), ("Plain", "text/plain")],
+            {"html": "<p>Html</p>", "text": "Plain"},
+        ),
+        ([("Plain", "text/plain")], {"text": "Plain"}),
+        ([], {"text": "Body"}),
+    ],
+)
+def test_email_backends_resend_build_payload_alternatives(alternatives, expected):
+    """The html and text parts should be taken from the message alternatives."""
+    message = mail.EmailMultiAlternatives(
+        "Subject", "Body", to=["to@example.com"], alternatives=alternatives
+    )
+
+    payload = ResendEmailBackend()._build_payload(  # pylint: disable=protected-access
+        message
+    )
+
+    assert {key: payload[key] for key in ("html", "text") if key in payload} == (
+        expected
+    )
+
+
+def test_email_backends_resend_encode_batch_shared_content():
+    """Payloads sharing their content should be encoded to the same JSON documents."""
+    messages = [
+        mail.EmailMessage(
+            "Document shared", "Body", to=[f"to{i}@example.com"], cc=["cc@example.com"]
+        )
+        for i in range(2)
+    ] + [mail.EmailMessage("Other", "Other body", to=["other@example.com"])]
+    backend = ResendEmailBackend()
+    # pylint: disable=protected-access
+    payloads = [backend._build_payload(message) for message in messages]
+
+    assert json.loads(backend._encode_batch(payloads)) == payloads
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_no_body_content():
+    """Messages without any body content should fail without calling the API."""
+    message = mail.EmailMultiAlternatives("Subject", "", to=["to@example.com"])
+
+    with pytest.raises(ValueError) as excinfo:
+        ResendEmailBackend().send_messages([message])
+
+    assert str(excinfo.value) == "Email has no body content"
+    assert ResendEmailBackend(fail_silently=True).send_messages([message]) == 0
+    assert len(responses.calls) == 0
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_without_batch(settings):
+    """
+    When the batch endpoint is disabled, messages should be sent concurrently
+    through the single email endpoint.
+    """
+    settings.RESEND_USE_BATCH = False
+    settings.RESEND_POOL_SIZE = 2
+    responses.post(RESEND_API_URL, json={"id": "1"})
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=[f"to{i}@example.com"])
+        for i in range(3)
+    ]
+
+    assert ResendEmailBackend().send_messages(messages) == 3
+
+    assert len(responses.calls) == 3
+    assert sorted(
+        json.loads(call.request.body)["to"][0] for call in responses.calls
+    ) == [f"to{i}@example.com" for i in range(3)]
+
+
+@responses.activate
+def test_email_backends_resend_send_messages_without_batch_failure(settings):
+    """Failed concurrent sends should raise or not be counted with fail_silently."""
+    settings.RESEND_USE_BATCH = False
+
+    def reject_bad_recipient(request):
+        if json.loads(request.body)["to"] == ["bad@example.com"]:
+            return 422, {}, json.dumps({"message": "Invalid"})
+        return 200, {}, json.dumps({"id": "1"})
+
+    responses.add_callback(responses.POST, RESEND_API_URL, reject_bad_recipient)
+    messages = [
+        mail.EmailMessage("Subject", "Body", to=["bad@example.com"]),
+        mail.EmailMessage("Subject", "Body", to=["good@example.com"]),
+    ]
+
+    assert ResendEmailBackend(fail_silently=True).send_messages(messages) == 1
+
+    with pytest.raises(ResendAPIError, match="Invalid"):
+        ResendEmailBackend().send_messages(messages)
+
+
+@pytest.mark.parametrize(
+    "status, retryable",
+    [(400, False), (422, False), (429, True), (503, True)],
+)
+@responses.activate
+def test_email_backends_resend_api_error(status, retryable):
+    """API errors should report their status and whether they can be retried."""
+    responses.post(RESEND_API_URL, status=status, json={"message": "Error"})
+    message = mail.EmailMessage("Subject", "Body", to=["to@example.com"])
+
+    with pytest.raises(ResendAPIError) as excinfo:
+        ResendEmailBackend().send_messages([message])
+
+    assert excinfo.value.status_code == status
+    assert excinfo.value.retryable is retryable
+    assert str(excinfo.value) == "Resend API error: {'message': 'Error'}"
+
+
+@responses.activate
+def test_email_backends_resend_api_error_connection_error():
+    """Connection errors have no status and can be retried."""
+    responses.post(RESEND_API_URL, body=requests.exceptions.ConnectionError())
+    message = mail.EmailMessage("Subject", "Body", to=["to@example.com"])
+
+    with pytest.raises(ResendAPIError) as excinfo:
+        ResendEmailBackend().send_messages([message])
+
+    assert excinfo.value.status_code is None
+    assert excinfo.value.retryable is True
@@ -0,0 +1,33 @@
+"""
+Unit tests for the OIDC routes exposed by the core application.
+"""
+
+from django.urls import resolve, reverse
+
+import pytest
+
+from core.authentication.views import (
+    OIDCAuthenticationRequestView,
+    OIDCLogoutCallbackView,
+    OIDCLogoutView,
+)
+
+
+@pytest.mark.parametrize(
+    "name, view_class",
+    [
+        ("oidc_authentication", OIDCAuthenticationRequestView),
+        ("oidc_logout", OIDCLogoutView),
+        ("oidc_logout_callback", OIDCLogoutCallbackView),
+    ],
+)
+def test_urls_oidc_views_are_replaced(name, view_class):
+    """The lasuite authenticate and logout views should be replaced by ours."""
+    match = resolve(reverse(name))
+
+    assert match.func.view_class is view_class
+
+
+def test_urls_oidc_authentication_callback_is_kept():
+    """The OIDC callback from lasuite should be kept as-is."""
+    assert reverse("oidc_authentication_callback").endswith("/callback/")
@@ -49,32 +49,27 @@ template_related_router.register(
 )
 
 
-# Filter OIDC URLs to replace authenticate and logout views with custom ones
-filtered_oidc_urls = []
-for url_pattern in oidc_urls:
-    # Check if this is the authenticate or logout URL pattern
-    url_str = str(url_pattern.pattern)
-    url_name = getattr(url_pattern, "name", None)
-    
-    # Replace authenticate view
-    if url_name == "oidc_authentication" or "authenticate" in url_str:
-        # Replace with our custom view
-        filtered_oidc_urls.append(
-            path("authenticate/", OIDCAuthenticationRequestView.as_view(), name="oidc_authentication")
-        )
-    # Replace logout view
-    elif url_name == "oidc_logout" or (hasattr(url_pattern, "name") and "logout" in str(url_name)):
-        # Replace with our custom view
-        filtered_oidc_urls.append(
-            path("logout/", OIDCLogoutView.as_view(), name="oidc_logout")
-        )
-    # Skip logout callback from lasuite - we'll add our own
-    elif url_name == "oidc_logout_callback" or "logout-callback" in url_str:
-        # Skip the default logout callback, we'll add our own below
-        continue
-    else:
-        # Keep other OIDC URLs as-is
-        filtered_oidc_urls.append(url_pattern)
+# Replace the authenticate and logout views of lasuite with custom ones, looked up
+# by URL name. Patterns mapped to None are dropped: the logout callback is added
+# below with our own view and the other logout routes are served by our logout view.
+_OIDC_URL_REPLACEMENTS = {
+    "oidc_authentication_init": path(
+        "authenticate/",
+        OIDCAuthenticationRequestView.as_view(),
+        name="oidc_authentication",
+    ),
+    "oidc_logout_custom": path("logout/", OIDCLogoutView.as_view(), name="oidc_logout"),
+    "oidc_logout": None,
+    "oidc_logout_callback": None,
+    "oidc_backchannel_logout": None,
+}
+
+filtered_oidc_urls = [
+    replacement
+    for url_pattern in oidc_urls
+    if (replacement := _OIDC_URL_REPLACEMENTS.get(url_pattern.name, url_pattern))
+    is not None
+]
 
 # Add logout callback URL with correct name
 filtered_oidc_urls.append(
@@ -457,6 +457,15 @@ class Base(Configuration):
         environ_name="RESEND_API_URL",
         environ_prefix=None,
     )
+    RESEND_POOL_SIZE = values.PositiveIntegerValue(
+        10, environ_name="RESEND_POOL_SIZE", environ_prefix=None
+    )
+    RESEND_BATCH_SIZE = values.PositiveIntegerValue(
+        100, environ_name="RESEND_BATCH_SIZE", environ_prefix=None
+    )
+    RESEND_USE_BATCH = values.BooleanValue(
+        True, environ_name="RESEND_USE_BATCH", environ_prefix=None
+    )
     
     # SMTP settings (for django.core.mail.backends.smtp.EmailBackend)
     EMAIL_HOST = values.Value(None)
@@ -873,9 +882,12 @@ class Base(Configuration):
         import logging
         logger = logging.getLogger(__name__)
         
-        if cls.EMAIL_BACKEND == "core.email_backends.ResendEmailBackend":
+        if cls.EMAIL_BACKEND in (
+            "core.email_backends.ResendEmailBackend",
+            "core.email_backends.QueuedResendEmailBackend",
+        ):
             logger.info(
-                f"Email configuration: backend=ResendEmailBackend (REST API), "
+                f"Email configuration: backend={cls.EMAIL_BACKEND} (REST API), "
                 f"from={cls.EMAIL_FROM}, api_key_set={bool(cls.RESEND_API_KEY)}, "
                 f"brand={cls.EMAIL_BRAND_NAME}, timeout={cls.EMAIL_TIMEOUT}s"
             )